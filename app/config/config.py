@@ -3,20 +3,65 @@
 使用 pydantic-settings 管理环境变量
 """
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
-from pydantic import Field
+from typing import Dict, Any, Mapping, Optional
+from pydantic import Field, PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 # 环境变量文件名常量
 ENV_FILE_NAME = ".env"
 
-# 在创建 Settings 实例之前，先加载 .env.local 文件中的所有环境变量到 os.environ
-# 这样即使 Settings 类中没有定义的字段，也能通过 os.getenv() 访问
-env_file = Path(ENV_FILE_NAME)
-if env_file.exists():
-    load_dotenv(env_file, override=False)  # override=False 表示不覆盖已存在的环境变量
+
+@lru_cache(maxsize=1)
+def load_env_file() -> bool:
+    """
+    加载 .env 文件中的所有环境变量到 os.environ（进程内只读取一次）
+    
+    这样即使 Settings 类中没有定义的字段，也能通过 os.getenv() 访问；
+    Settings 也直接从 os.environ 读取，不再重复解析 .env 文件
+    
+    Returns:
+        bool: 是否成功加载了 .env 文件
+    """
+    env_file = Path(ENV_FILE_NAME)
+    if not env_file.exists():
+        return False
+    # override=False 表示不覆盖已存在的环境变量
+    return load_dotenv(env_file, encoding="utf-8", override=False)
+
+
+# 在创建 Settings 实例之前，先加载 .env 文件
+load_env_file()
+
+@lru_cache(maxsize=None)
+def get_api_key_env_name(model_key: str) -> str:
+    """
+    获取模型 API Key 的环境变量名称
+    
+    模型标识符的数量有限，结果按模型标识符缓存，每个模型只需转换一次
+    
+    Args:
+        model_key: 模型标识符
+    
+    Returns:
+        str: 环境变量名称，格式为 DASHSCOPE_API_KEY_{模型标识符}（大写，下划线分隔）
+    """
+    # 将模型标识符转换为大写，并将连字符替换为下划线
+    env_suffix = model_key.upper().replace("-", "_")
+    return f"DASHSCOPE_API_KEY_{env_suffix}"
+
+
+def get_upper_environ() -> Dict[str, str]:
+    """
+    获取环境变量名转为大写后的环境变量字典，用于不区分大小写地查找环境变量
+    
+    Returns:
+        Dict[str, str]: 环境变量字典，key 为大写的环境变量名
+    """
+    return {key.upper(): value for key, value in os.environ.items()}
+
 
 class Settings(BaseSettings):
     # 应用配置
@@ -32,10 +77,18 @@ class Settings(BaseSettings):
     # 回调配置
     callback_domain: str = ""  # 回调域名，从环境变量 CALLBACK_DOMAIN 读取
     callback_key: str = ""  # 回调API Key，从环境变量 CALLBACK_KEY 读取
+    callback_workers: int = 8  # 并发发送回调的协程数
+    callback_queue_size: int = 1000  # 回调队列长度上限，队列满时新的回调会等待
+    
+    # LLM 结果缓存配置（默认关闭，需要时通过环境变量 LLM_CACHE_SIZE 开启）
+    # 开启后，相同模型、相同文本在有效期内直接返回第一次的识别结果，
+    # 重试任务也会得到相同的结果，不会重新调用 LLM 生成新的结果
+    llm_cache_size: int = 0  # 进程内缓存的 LLM 结果条数，0表示不缓存
+    llm_cache_ttl: int = 86400  # LLM 结果缓存有效期（秒）
     
     # LLM 多模型配置
     # 模型配置字典，key 为模型标识符（用于选择模型），value 为模型配置
-    # API Key 通过环境变量读取，命名规则：DASHSCOPE_API_KEY_{模型标识符}（大写，下划线分隔）
+    # API Key 通过 get_api_key() 按需从环境变量读取，命名规则：DASHSCOPE_API_KEY_{模型标识符}（大写，下划线分隔）
     # 例如：模型标识符为 "qwen-turbo"，则环境变量名为 DASHSCOPE_API_KEY_QWEN_TURBO
     # 默认配置示例（可在代码中修改或通过环境变量覆盖）
     llm_models_config: Dict[str, Dict[str, Any]] = Field(
@@ -58,16 +111,69 @@ class Settings(BaseSettings):
         description="LLM 多模型配置字典"
     )
     
+    # 已读取到的模型 API Key 缓存，key 为模型标识符
+    _api_keys: Dict[str, str] = PrivateAttr(default_factory=dict)
+    
     # 配置读取环境变量
+    # .env 文件已由 load_env_file() 加载到 os.environ，这里不再指定 env_file，避免重复解析
     model_config = SettingsConfigDict(
-        env_file=ENV_FILE_NAME,  # 指定 .env 文件
-        env_file_encoding="utf-8",
         case_sensitive=False,  # 环境变量名不区分大小写（ENV_NAME 和 env_name 都可以）
-        extra="ignore",  # 忽略 .env 文件中未定义的变量
+        extra="ignore",  # 忽略未定义的变量
     )
+    
+    def get_api_key(
+        self,
+        model_key: str,
+        upper_environ: Optional[Mapping[str, str]] = None
+    ) -> str:
+        """
+        获取模型的 API Key
+        
+        首次访问时才从环境变量读取，读取成功后缓存；未读取到时不缓存，
+        以便之后在 os.environ 中补充配置后能够生效
+        
+        Args:
+            model_key: 模型标识符
+            upper_environ: 可选，环境变量名已转为大写的环境变量字典（见 get_upper_environ()），
+                一次查询多个模型时传入，避免每个模型都遍历一遍 os.environ
+        
+        Returns:
+            str: API Key，未配置时返回空字符串
+        """
+        api_key = self._api_keys.get(model_key)
+        if api_key:
+            return api_key
+        
+        api_key_env_name = get_api_key_env_name(model_key)
+        api_key = os.getenv(api_key_env_name, "")
+        
+        # 如果环境变量未设置，尝试不区分大小写查找
+        # pydantic-settings 默认不区分大小写，但 os.getenv 区分大小写
+        if not api_key:
+            if upper_environ is None:
+                upper_environ = get_upper_environ()
+            api_key = upper_environ.get(api_key_env_name.upper(), "")
+        
+        if api_key:
+            self._api_keys[model_key] = api_key
+        return api_key
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    获取全局配置实例（进程内只创建一次）
+    
+    注意：各模块在导入时就读取了模块级的 settings，修改配置需要在导入应用之前设置环境变量
+    
+    Returns:
+        Settings: 配置实例
+    """
+    load_env_file()
+    return Settings()
 
 
 # 创建全局配置实例
 # 当这个模块被导入时，会自动读取 .env 文件并创建配置对象
-settings = Settings()
+settings = get_settings()
 
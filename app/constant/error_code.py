@@ -20,4 +20,5 @@ class ErrorCode:
     TASK_NOT_FOUND = 20002  # 任务不存在
     TASK_ID_EXISTS = 20003  # 任务ID已存在
     TASK_TYPE_NOT_SUPPORTED = 20004  # 不支持的任务类型
-    TASK_EXECUTION_FAILED = 20005  # 任务执行失败
\ No newline at end of file
+    TASK_EXECUTION_FAILED = 20005  # 任务执行失败
+    TASK_LIMIT_EXCEEDED = 20006  # 任务数已达到上限
\ No newline at end of file
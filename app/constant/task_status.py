@@ -1,8 +1,8 @@
 """任务状态枚举"""
-from enum import Enum
+from enum import IntEnum
 
 
-class TaskStatus(int, Enum):
+class TaskStatus(IntEnum):
     """任务状态枚举"""
     PENDING = 1  # 待执行
     RUNNING = 2  # 执行中
@@ -12,10 +12,13 @@ class TaskStatus(int, Enum):
     @property
     def name_cn(self) -> str:
         """获取中文名称"""
-        name_map = {
-            TaskStatus.PENDING: "待执行",
-            TaskStatus.RUNNING: "执行中",
-            TaskStatus.SUCCESS: "成功",
-            TaskStatus.FAILED: "失败",
-        }
-        return name_map[self]
+        return _NAME_CN_MAP[self]
+
+
+# 中文名称映射表（模块加载时创建一次）
+_NAME_CN_MAP = {
+    TaskStatus.PENDING: "待执行",
+    TaskStatus.RUNNING: "执行中",
+    TaskStatus.SUCCESS: "成功",
+    TaskStatus.FAILED: "失败",
+}
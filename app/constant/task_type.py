@@ -1,8 +1,8 @@
 """任务类型枚举"""
-from enum import Enum
+from enum import IntEnum
 
 
-class TaskType(int, Enum):
+class TaskType(IntEnum):
     """任务类型枚举"""
     TEXT_TO_ORDER = 1  # 文本生成订单
     IMAGE_TO_ORDER = 2  # 图片生成订单
@@ -11,18 +11,24 @@ class TaskType(int, Enum):
     @property
     def name_cn(self) -> str:
         """获取中文名称"""
-        name_map = {
-            TaskType.TEXT_TO_ORDER: "文本生成订单",
-            TaskType.IMAGE_TO_ORDER: "图片生成订单",
-            TaskType.VOICE_TO_ORDER: "语音生成订单",
-        }
-        return name_map[self]
+        return _NAME_CN_MAP[self]
     
     @classmethod
     def get_all_types(cls) -> list[dict]:
-        """获取所有任务类型的列表，格式为 [{key: int, name: str}]"""
-        return [
-            {"key": cls.TEXT_TO_ORDER.value, "name": cls.TEXT_TO_ORDER.name_cn},
-            {"key": cls.IMAGE_TO_ORDER.value, "name": cls.IMAGE_TO_ORDER.name_cn},
-            {"key": cls.VOICE_TO_ORDER.value, "name": cls.VOICE_TO_ORDER.name_cn},
-        ]
+        """
+        获取所有任务类型的列表，格式为 [{key: int, name: str}]
+        
+        列表内容在模块加载时生成，每次调用返回新的列表（列表中的字典共享，不要修改）
+        """
+        return list(_ALL_TYPES)
+
+
+# 中文名称映射表（模块加载时创建一次）
+_NAME_CN_MAP = {
+    TaskType.TEXT_TO_ORDER: "文本生成订单",
+    TaskType.IMAGE_TO_ORDER: "图片生成订单",
+    TaskType.VOICE_TO_ORDER: "语音生成订单",
+}
+
+# 所有任务类型列表（模块加载时生成一次）
+_ALL_TYPES = tuple({"key": t.value, "name": t.name_cn} for t in TaskType)
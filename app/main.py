@@ -1,14 +1,20 @@
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any
+import orjson
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.utils.logger import get_logger
-from app.config.config import settings
+from app.config.config import get_settings
 from app.routers import task
 from app.utils.logger import setup_logging
-from app.utils.response import error_response
 from app.utils.exceptions import CustomException
 from app.services.task_executor import task_executor
+from app.services.callback_service import callback_service
 from app.tasks.text_to_order import TextToOrderTask
 from app.tasks.image_to_order import ImageToOrderTask
 from app.tasks.voice_to_order import VoiceToOrderTask
@@ -23,19 +29,57 @@ setup_logging(
 )
 logger = get_logger("app")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：关闭时释放共享的 HTTP 连接池"""
+    yield
+    await callback_service.aclose()
+
+
+# 默认使用 ORJSONResponse 序列化响应（orjson 比标准库 json 更快）
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # 注册路由
 app.include_router(task.router, prefix="/task", tags=["task"])
 
 # 初始化任务执行器：注册任务类型
-task_executor.register_task_type(TaskType.TEXT_TO_ORDER, TextToOrderTask)
-task_executor.register_task_type(TaskType.IMAGE_TO_ORDER, ImageToOrderTask)
-task_executor.register_task_type(TaskType.VOICE_TO_ORDER, VoiceToOrderTask)
-logger.info("任务类型注册完成:")
-logger.info(f"  - {TaskType.TEXT_TO_ORDER.value}: {TaskType.TEXT_TO_ORDER.name_cn}")
-logger.info(f"  - {TaskType.IMAGE_TO_ORDER.value}: {TaskType.IMAGE_TO_ORDER.name_cn}")
-logger.info(f"  - {TaskType.VOICE_TO_ORDER.value}: {TaskType.VOICE_TO_ORDER.name_cn}")
+task_executor.register_task_types({
+    TaskType.TEXT_TO_ORDER: TextToOrderTask,
+    TaskType.IMAGE_TO_ORDER: ImageToOrderTask,
+    TaskType.VOICE_TO_ORDER: VoiceToOrderTask,
+})
+logger.info(
+    "任务类型注册完成: %s",
+    ", ".join(f"{task_type.value}: {task_type.name_cn}" for task_type in TaskType)
+)
+
+
+def _error_payload(code: int, message: str, data: Any = None) -> dict:
+    """
+    构建错误响应内容，字段与 StandardResponse 一致
+    
+    错误响应的结构是固定的，直接构建字典，省去 Pydantic 模型的构建和 model_dump
+    """
+    return {"code": code, "message": message, "data": data}
+
+
+@lru_cache(maxsize=256)
+def _error_content(code: int, message: str) -> dict:
+    """
+    获取不带 data 的错误响应内容（按 code 和 message 缓存）
+    
+    404、405、500 等错误的 code 和 message 取值有限，缓存后无需每次都构建新的字典
+    注意：返回的字典会被多个请求共享，不能修改
+    """
+    return _error_payload(code, message)
+
+
+# 请求参数验证失败时，日志中最多记录的请求体字节数
+_LOG_BODY_MAX_BYTES = 4096
+
+# 默认 500 错误的响应体，内容固定，只需序列化一次
+_INTERNAL_ERROR_BODY = orjson.dumps(_error_content(500, "服务器内部错误"))
 
 
 """
@@ -45,12 +89,12 @@ raise HTTPException(status_code=500, detail="自定义错误内容")
 """
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=error_response(
-            code=exc.status_code,
-            message=exc.detail if isinstance(exc.detail, str) else str(exc.detail)
-        ).model_dump()
+        content=_error_content(
+            exc.status_code,
+            exc.detail if isinstance(exc.detail, str) else str(exc.detail)
+        )
     )
 
 
@@ -59,12 +103,12 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 """
 @app.exception_handler(StarletteHTTPException)
 async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=error_response(
-            code=exc.status_code,
-            message=exc.detail if isinstance(exc.detail, str) else str(exc.detail)
-        ).model_dump()
+        content=_error_content(
+            exc.status_code,
+            exc.detail if isinstance(exc.detail, str) else str(exc.detail)
+        )
     )
 
 
@@ -74,38 +118,38 @@ async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPE
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     errors = exc.errors()
-    error_messages = []
-    for error in errors:
-        field = ".".join(str(loc) for loc in error.get("loc", []))
-        message = error.get("msg", "Validation error")
-        error_messages.append(f"{field}: {message}")
+    error_messages = [
+        f"{'.'.join(map(str, error.get('loc', ())))}: {error.get('msg', 'Validation error')}"
+        for error in errors
+    ]
+    error_msg = "; ".join(error_messages) or "请求参数验证失败"
     
-    error_msg = "; ".join(error_messages) if error_messages else "请求参数验证失败"
-    
-    # 记录请求详细信息用于调试
-    try:
-        # 读取请求体
-        body = await request.body()
-        body_str = body.decode('utf-8') if body else ""
-        
-        # 记录请求信息
-        logger.warning(
-            f"请求参数验证失败 - URL: {request.url.path}, "
-            f"Method: {request.method}, "
-            f"Headers: {dict(request.headers)}, "
-            f"Body: {body_str}, "
-            f"Errors: {error_messages}"
-        )
-    except Exception as e:
-        logger.warning(f"记录请求信息时出错: {str(e)}")
+    # 记录请求详细信息用于调试（日志级别未开启 WARNING 时跳过，避免读取请求体）
+    if logger.isEnabledFor(logging.WARNING):
+        try:
+            # 读取请求体（只记录前 4KB，避免大请求体占用过多内存和日志空间）
+            body = await request.body()
+            body_str = body[:_LOG_BODY_MAX_BYTES].decode('utf-8', errors='replace') if body else ""
+            if len(body) > _LOG_BODY_MAX_BYTES:
+                body_str += "…(truncated)"
+            
+            # 记录请求信息（Headers 转为 dict 输出，与原有日志格式保持一致）
+            logger.warning(
+                "请求参数验证失败 - URL: %s, Method: %s, Headers: %s, Body: %s, Errors: %s",
+                request.url.path,
+                request.method,
+                dict(request.headers),
+                body_str,
+                error_messages
+            )
+        except Exception as e:
+            logger.warning("记录请求信息时出错: %s", e)
     
-    return JSONResponse(
+    # data 每次都不同，不走缓存
+    # errors 的 ctx 中可能包含异常对象（如自定义校验器抛出的 ValueError），需要先转换为可序列化的数据
+    return ORJSONResponse(
         status_code=400,
-        content=error_response(
-            code=400,
-            message=error_msg,
-            data={"errors": errors}
-        ).model_dump()
+        content=_error_payload(400, error_msg, {"errors": jsonable_encoder(errors)})
     )
 
 
@@ -117,13 +161,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 """
 @app.exception_handler(CustomException)
 async def custom_exception_handler(request: Request, exc: CustomException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=error_response(
-            code=exc.code,
-            message=exc.message,
-            data=exc.data
-        ).model_dump()
+        content=_error_payload(exc.code, exc.message, exc.data)
     )
 
 
@@ -135,31 +175,23 @@ async def custom_exception_handler(request: Request, exc: CustomException):
 """
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    from app.utils.logger import get_logger
-    logger = get_logger("app")
-    logger.error(f"未处理的异常: {str(exc)}", exc_info=True)
+    logger.error("未处理的异常: %s", exc, exc_info=True)
     
     # 检查异常是否有自定义的 code 和 message 属性
     if hasattr(exc, 'code') and hasattr(exc, 'message'):
         status_code = getattr(exc, 'status_code', 500)
         data = getattr(exc, 'data', None)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
-            content=error_response(
-                code=exc.code,
-                message=exc.message,
-                data=data
-            ).model_dump()
+            content=_error_payload(exc.code, exc.message, data)
         )
     
-    # 默认处理：返回 500 错误
-    return JSONResponse(
+    # 默认处理：返回 500 错误（响应体在模块加载时已序列化）
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
         status_code=500,
-        content=error_response(
-            code=500,
-            message="服务器内部错误"
-        ).model_dump()
+        media_type="application/json"
     )
 
 # 启动项目
-logger.info(f"启动项目: {settings.env_name}")
\ No newline at end of file
+logger.info("启动项目: %s", get_settings().env_name)
\ No newline at end of file
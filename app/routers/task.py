@@ -1,25 +1,64 @@
 """任务路由模块"""
 import asyncio
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 from app.schemas.task import TaskCreateRequest, TaskResponse, TaskListResponse, TaskGetDetailRequest
 from app.schemas.response import StandardResponse
 from app.services.task_manager import task_manager
 from app.services.task_executor import task_executor
 from app.utils.logger import get_logger
-from app.utils.response import success_response
+from app.utils.response import success_json_response
 from app.utils.auth import verify_api_key
 from app.utils.exceptions import CustomException
 from app.constant.error_code import ErrorCode
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = get_logger("app")
 
+# 后台执行中的任务，保留强引用，避免任务在执行过程中被垃圾回收
+_BG_TASKS: set[asyncio.Task] = set()
 
-@router.post("/create", response_model=StandardResponse)
+
+def _parse_task_create_request(body: bytes) -> TaskCreateRequest:
+    """
+    直接在原始请求体上校验创建任务请求
+    
+    使用 pydantic-core 的 JSON 解析（model_validate_json），省去先用标准库 json 解析成字典再校验的过程
+    
+    Args:
+        body: 原始请求体
+    
+    Returns:
+        TaskCreateRequest: 校验后的请求模型
+    
+    Raises:
+        RequestValidationError: 校验失败时抛出，与 FastAPI 自动校验的错误格式一致
+    """
+    try:
+        return TaskCreateRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+@router.post(
+    "/create",
+    response_model=StandardResponse,
+    # 请求体由 _parse_task_create_request 手动校验，这里声明请求体结构用于生成 OpenAPI 文档
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": TaskCreateRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
 async def create_task(
-    request: TaskCreateRequest,
+    http_request: Request,
     api_key: str = Depends(verify_api_key)
-) -> StandardResponse:
+) -> ORJSONResponse:
     """
     创建任务
     
@@ -30,6 +69,7 @@ async def create_task(
     创建任务后会立即异步启动执行
     回调URL、回调方法和回调请求头使用环境变量固定配置
     """
+    request = _parse_task_create_request(await http_request.body())
     
     try:
         # 创建任务（会检查任务ID是否已存在）
@@ -40,21 +80,23 @@ async def create_task(
         )
         
         logger.info(
-            f"创建任务成功: task_id={request.task_id}, "
-            f"task_type={request.task_type}"
+            "创建任务成功: task_id=%s, task_type=%s",
+            request.task_id, request.task_type
         )
         
         # 立即异步启动执行任务（不阻塞响应）
-        asyncio.create_task(
+        bg_task = asyncio.create_task(
             task_executor.execute_task(
                 task_id=request.task_id,
                 task_type=request.task_type,
                 input=request.input
             )
         )
+        _BG_TASKS.add(bg_task)
+        bg_task.add_done_callback(_BG_TASKS.discard)
         
-        # 返回成功响应
-        return success_response(
+        # 返回成功响应（直接返回 ORJSONResponse，跳过 response_model 的校验和序列化）
+        return success_json_response(
             data={"taskId": request.task_id},
             message="任务创建成功"
         )
@@ -63,7 +105,7 @@ async def create_task(
         # 重新抛出自定义异常，会被异常处理器捕获
         raise
     except Exception as e:
-        logger.error(f"创建任务失败: {str(e)}", exc_info=True)
+        logger.error("创建任务失败: %s", e, exc_info=True)
         raise CustomException(
             code=ErrorCode.UNKNOWN_ERROR,
             message=f"创建任务失败: {str(e)}",
@@ -75,7 +117,7 @@ async def create_task(
 async def get_task(
     request: TaskGetDetailRequest,
     api_key: str = Depends(verify_api_key)
-) -> StandardResponse[TaskResponse]:
+) -> ORJSONResponse:
     """
     查询任务状态
     
@@ -93,8 +135,9 @@ async def get_task(
             status_code=404
         )
     
-    return success_response(
-        data=task.to_response(),
+    # 直接返回 ORJSONResponse，跳过 response_model 的校验和序列化
+    return success_json_response(
+        data=task.to_response_dict(),
         message="查询成功"
     )
 
@@ -102,7 +145,7 @@ async def get_task(
 @router.post("/get-list", response_model=StandardResponse[TaskListResponse])
 async def get_tasks(
     api_key: str = Depends(verify_api_key)
-) -> StandardResponse[TaskListResponse]:
+) -> ORJSONResponse:
     """
     查询任务列表
     
@@ -111,10 +154,11 @@ async def get_tasks(
     # 获取所有任务列表
     tasks = await task_manager.get_tasks()
     
-    # 转换为响应模型
-    task_responses = [task.to_response() for task in tasks]
+    # 转换为响应数据
+    task_responses = [task.to_response_dict() for task in tasks]
     
-    return success_response(
-        data=TaskListResponse(tasks=task_responses, total=len(task_responses)),
+    # 列表可能很大，直接返回 ORJSONResponse，跳过 response_model 的重复校验和序列化
+    return success_json_response(
+        data={"tasks": task_responses, "total": len(task_responses)},
         message="查询成功"
     )
@@ -0,0 +1,36 @@
+"""订单相关的数据模型"""
+from typing import Any, Optional, List, Union
+from pydantic import BaseModel, BeforeValidator, Field, StrictInt, StrictFloat, StrictStr, StringConstraints
+from pydantic_core import PydanticCustomError
+from typing_extensions import Annotated
+
+
+def _check_number(value: Any) -> Any:
+    """
+    检查是否为数字（整数或小数），布尔值、字符串等其他类型直接报错
+    
+    先统一检查类型，错误信息只报一次，不会 int、float 两种类型各报一次
+    """
+    if type(value) is not int and type(value) is not float:
+        raise PydanticCustomError("number_type", "Input should be a valid number")
+    return value
+
+
+# 非空字符串（去除首尾空白后）
+NonEmptyStr = Annotated[StrictStr, StringConstraints(strip_whitespace=True, min_length=1)]
+# 数字（整数或小数），不接受字符串、布尔值等其他类型，整数保持为整数
+Number = Annotated[Union[StrictInt, StrictFloat], BeforeValidator(_check_number)]
+
+
+class OrderProduct(BaseModel):
+    """订单商品模型（LLM 识别结果中的单个商品）"""
+    name: NonEmptyStr = Field(..., description="商品名称")
+    quantity: Annotated[Number, Field(gt=0)] = Field(..., description="数量，必须大于0")
+    unit: NonEmptyStr = Field(..., description="单位")
+    price: Optional[Number] = Field(None, description="价格，没有价格时为 null")
+    remark: Optional[StrictStr] = Field(None, description="备注，没有备注时为 null")
+
+
+class OrderOutput(BaseModel):
+    """订单识别结果模型"""
+    products: List[OrderProduct] = Field(..., description="商品列表")
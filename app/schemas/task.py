@@ -1,11 +1,17 @@
 """任务相关的数据模型"""
-import json
+import orjson
 from typing import Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, ConfigDict
+from typing_extensions import TypedDict
 from app.constant.task_status import TaskStatus
 from app.constant.task_type import TaskType
 
+# input 序列化后的最大字节数（1MB）
+MAX_INPUT_SIZE = 1024 * 1024
+# input 的最大嵌套深度
+MAX_INPUT_DEPTH = 10
+
 
 class TaskCreateRequest(BaseModel):
     """创建任务请求模型"""
@@ -25,9 +31,9 @@ class TaskCreateRequest(BaseModel):
     @classmethod
     def validate_task_type(cls, v: int) -> int:
         """验证任务类型是否有效"""
-        valid_types = [TaskType.TEXT_TO_ORDER.value, TaskType.IMAGE_TO_ORDER.value, TaskType.VOICE_TO_ORDER.value]
-        if v not in valid_types:
-            valid_types_str = ", ".join(map(str, valid_types))
+        # 直接查询枚举的值映射表，无效值时不会触发 TaskType(v) 的异常构造
+        if v not in TaskType._value2member_map_:
+            valid_types_str = ", ".join(str(t.value) for t in TaskType)
             raise ValueError(f"无效的任务类型: {v}，有效值: {valid_types_str}")
         return v
     
@@ -47,36 +53,30 @@ class TaskCreateRequest(BaseModel):
             raise ValueError("input 不能为空字典")
         
         # 检查 JSON 序列化后的大小（限制为 1MB）
+        # orjson 直接输出 bytes，无需先生成 str 再编码
         try:
-            json_str = json.dumps(v, ensure_ascii=False)
-            size_mb = len(json_str.encode('utf-8')) / (1024 * 1024)
-            if size_mb > 1:
-                raise ValueError(f"input 序列化后大小不能超过 1MB，当前大小: {size_mb:.2f}MB")
-        except (TypeError, ValueError) as e:
-            if isinstance(e, ValueError) and "大小不能超过" in str(e):
-                raise
+            size = len(orjson.dumps(v))
+        except TypeError as e:
+            # orjson.JSONEncodeError 是 TypeError 的子类
             raise ValueError(f"input 包含无法序列化的数据: {str(e)}")
+        if size > MAX_INPUT_SIZE:
+            raise ValueError(f"input 序列化后大小不能超过 1MB，当前大小: {size / (1024 * 1024):.2f}MB")
         
         # 检查嵌套深度（限制为 10 层）
-        def get_depth(obj: Any, current_depth: int = 0) -> int:
-            """递归计算字典/列表的最大嵌套深度"""
-            if current_depth > 10:
-                return current_depth
-            
+        # 使用显式栈迭代遍历，超过限制时立即停止
+        stack = [(v, 0)]
+        while stack:
+            obj, depth = stack.pop()
             if isinstance(obj, dict):
-                if not obj:
-                    return current_depth
-                return max(get_depth(v, current_depth + 1) for v in obj.values())
+                children = obj.values()
             elif isinstance(obj, list):
-                if not obj:
-                    return current_depth
-                return max(get_depth(item, current_depth + 1) for item in obj)
+                children = obj
             else:
-                return current_depth
-        
-        depth = get_depth(v)
-        if depth > 10:
-            raise ValueError(f"input 嵌套深度不能超过 10 层，当前深度: {depth}")
+                continue
+            
+            if children and depth + 1 > MAX_INPUT_DEPTH:
+                raise ValueError(f"input 嵌套深度不能超过 {MAX_INPUT_DEPTH} 层，当前深度: {depth + 1}")
+            stack.extend((child, depth + 1) for child in children)
         
         return v
 
@@ -95,9 +95,26 @@ class TaskResponse(BaseModel):
     updated_at: datetime = Field(..., alias="updatedAt")
 
 
+class TaskResponseDict(TypedDict):
+    """
+    任务响应数据（字典形式）
+    
+    字段名与 TaskResponse 的别名一致，用于列表等批量返回的场景，
+    无需为每个任务构建 BaseModel 实例
+    """
+    taskId: str
+    taskType: int
+    status: TaskStatus
+    progress: Optional[str]
+    input: Dict[str, Any]
+    output: Optional[Dict[str, Any]]
+    createdAt: datetime
+    updatedAt: datetime
+
+
 class TaskListResponse(BaseModel):
     """任务列表响应模型"""
-    tasks: list[TaskResponse]
+    tasks: list[TaskResponseDict]
     total: int
 
 
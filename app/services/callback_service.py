@@ -1,8 +1,8 @@
 """回调服务模块"""
 import asyncio
-import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import httpx
+import orjson
 from app.constant.task_status import TaskStatus
 from app.config.config import settings
 from app.utils.logger import get_logger
@@ -13,8 +13,88 @@ logger = get_logger("app")
 class CallbackService:
     """回调服务，负责向业务模块发送回调请求"""
     
+    # 回调连接池大小
+    MAX_CONNECTIONS = 128
+    MAX_KEEPALIVE_CONNECTIONS = 64
+    
     def __init__(self):
         self.timeout = settings.callback_timeout
+        # 回调URL和请求头使用固定配置，进程内不变，只构建一次
+        self._callback_url = settings.callback_domain + "/ai-task/callback-update"
+        self._callback_headers = {"Content-Type": "application/json; charset=utf-8"}
+        if settings.callback_key:
+            self._callback_headers["x-api-key"] = settings.callback_key
+        # 共享的 HTTP 客户端，首次发送回调时创建（需要在事件循环中创建），复用连接池
+        self._client: Optional[httpx.AsyncClient] = None
+        # 回调队列和固定数量的发送协程，首次回调时创建
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        获取共享的 HTTP 客户端，不存在或已关闭时创建
+        
+        Returns:
+            httpx.AsyncClient: HTTP 客户端
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return self._client
+    
+    def _get_queue(self) -> asyncio.Queue:
+        """
+        获取回调队列，不存在时创建队列并启动发送协程
+        
+        队列有长度上限，队列满时 callback() 会等待，避免突发大量回调时无限占用内存
+        
+        Returns:
+            asyncio.Queue: 回调队列
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.callback_queue_size)
+            self._workers = [
+                asyncio.create_task(self._worker(self._queue))
+                for _ in range(settings.callback_workers)
+            ]
+        return self._queue
+    
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """
+        发送协程，循环从队列中取出回调并发送
+        
+        Args:
+            queue: 回调队列
+        """
+        while True:
+            item = await queue.get()
+            try:
+                await self._send_callback(**item)
+            finally:
+                queue.task_done()
+    
+    async def aclose(self) -> None:
+        """等待队列中的回调发送完成，停止发送协程并关闭共享的 HTTP 客户端（应用关闭时调用）"""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning("等待回调发送超时，剩余 %d 个回调未发送", self._queue.qsize())
+            
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._queue = None
+            self._workers = []
+        
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def callback(
         self,
@@ -32,26 +112,21 @@ class CallbackService:
             output: 任务输出（成功时为结果，失败时为包含error的字典）
             progress: 任务进度信息
         """
-        # 构建回调数据
-        callback_data = {
+        # 构建回调数据，入队前使用 orjson 序列化为请求体，队列中只保存字节串
+        callback_body = orjson.dumps({
             "taskId": task_id,
             "taskStatus": status.value,
             "progress": progress,
-            "output": json.dumps(output, ensure_ascii=False) if output is not None else None
-        }
-        
-        # 使用固定配置构建回调URL和请求头
-        callback_url = settings.callback_domain + "/ai-task/callback-update"
-        callback_headers = {"Content-Type": "application/json; charset=utf-8"}
-        if settings.callback_key:
-            callback_headers["x-api-key"] = settings.callback_key
+            # 业务模块约定 output 为 JSON 字符串，使用 orjson 序列化（比标准库 json 更快）
+            "output": orjson.dumps(output, option=orjson.OPT_NON_STR_KEYS).decode() if output is not None else None
+        })
         
-        # 使用 asyncio.create_task 异步执行，不阻塞主流程
-        asyncio.create_task(self._send_callback(
-            callback_url=callback_url,
+        # 放入回调队列，由发送协程异步发送，不阻塞主流程
+        await self._get_queue().put(dict(
+            callback_url=self._callback_url,
             callback_method="POST",  # 固定使用POST
-            callback_headers=callback_headers,
-            callback_data=callback_data,
+            callback_headers=self._callback_headers,
+            callback_body=callback_body,
             task_id=task_id
         ))
     
@@ -60,7 +135,7 @@ class CallbackService:
         callback_url: str,
         callback_method: str,
         callback_headers: Optional[Dict[str, str]],
-        callback_data: Dict[str, Any],
+        callback_body: bytes,
         task_id: str
     ) -> None:
         """
@@ -70,44 +145,43 @@ class CallbackService:
             callback_url: 回调URL
             callback_method: 回调方法
             callback_headers: 回调请求头
-            callback_data: 回调数据
+            callback_body: 已序列化的回调数据（JSON）
             task_id: 任务ID
         """
         try:
-            # 使用 httpx.AsyncClient 异步发送HTTP请求
+            # 使用共享的 httpx.AsyncClient 异步发送HTTP请求，复用连接
             # 固定使用POST方法
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    callback_url,
-                    json=callback_data,
-                    headers=callback_headers
+            # 请求体已由 orjson 预先序列化，避免 httpx 再用标准库 json 编码
+            response = await self._get_client().post(
+                callback_url,
+                content=callback_body,
+                headers=callback_headers
+            )
+            
+            # 检查响应状态
+            if response.is_success:
+                logger.info(
+                    "回调成功: task_id=%s, url=%s, status_code=%s",
+                    task_id, callback_url, response.status_code
+                )
+            else:
+                logger.warning(
+                    "回调失败: task_id=%s, url=%s, status_code=%s, response=%s",
+                    task_id, callback_url, response.status_code, response.text[:200]
                 )
-                
-                # 检查响应状态
-                if response.is_success:
-                    logger.info(
-                        f"回调成功: task_id={task_id}, "
-                        f"url={callback_url}, status_code={response.status_code}"
-                    )
-                else:
-                    logger.warning(
-                        f"回调失败: task_id={task_id}, "
-                        f"url={callback_url}, status_code={response.status_code}, "
-                        f"response={response.text[:200]}"
-                    )
         
         except httpx.TimeoutException:
             logger.error(
-                f"回调超时: task_id={task_id}, url={callback_url}, "
-                f"timeout={self.timeout}s"
+                "回调超时: task_id=%s, url=%s, timeout=%ss",
+                task_id, callback_url, self.timeout
             )
         except httpx.HTTPError as e:
             logger.error(
-                f"回调HTTP错误: task_id={task_id}, url={callback_url}, error={str(e)}"
+                "回调HTTP错误: task_id=%s, url=%s, error=%s", task_id, callback_url, e
             )
         except Exception as e:
             logger.error(
-                f"回调异常: task_id={task_id}, url={callback_url}, error={str(e)}",
+                "回调异常: task_id=%s, url=%s, error=%s", task_id, callback_url, e,
                 exc_info=True
             )
 
@@ -1,14 +1,21 @@
 """LangChain 服务模块"""
-import os
-from typing import List, Union, Dict, Any, AsyncIterator, Optional
+from typing import List, Union, Dict, Any, AsyncIterator, Optional, Type
 from langchain_community.chat_models import ChatTongyi
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.language_models.chat_models import BaseChatModel
-from app.config.config import settings
+from app.config.config import settings, get_api_key_env_name, get_upper_environ
 from app.utils.logger import get_logger
 
 logger = get_logger("app")
 
+# 消息角色到 LangChain 消息类型的映射，未知角色默认作为用户消息处理
+_ROLE_TO_MESSAGE_CLASS: Dict[str, Type[BaseMessage]] = {
+    "user": HumanMessage,
+    "assistant": AIMessage,
+    "ai": AIMessage,
+    "system": SystemMessage,
+}
+
 
 class LangChainService:
     """LangChain 服务类，统一管理 LLM 模型的调用"""
@@ -16,6 +23,7 @@ class LangChainService:
     def __init__(self):
         """初始化服务，根据配置创建模型实例"""
         self.models: Dict[str, BaseChatModel] = {}  # 模型字典，key 为模型标识符
+        self._default_key: Optional[str] = None  # 默认模型标识符（第一个可用模型）
         self._initialize_models()
     
     def _get_api_key_env_name(self, model_key: str) -> str:
@@ -28,14 +36,13 @@ class LangChainService:
         Returns:
             str: 环境变量名称，格式为 DASHSCOPE_API_KEY_{模型标识符}（大写，下划线分隔）
         """
-        # 将模型标识符转换为大写，并将连字符替换为下划线
-        env_suffix = model_key.upper().replace("-", "_")
-        return f"DASHSCOPE_API_KEY_{env_suffix}"
+        return get_api_key_env_name(model_key)
     
     def _create_tongyi_model(
         self,
         model_key: str,
         model_config: Dict[str, Any],
+        upper_environ: Optional[Dict[str, str]] = None,
     ) -> ChatTongyi:
         """
         创建通义千问模型实例
@@ -43,6 +50,7 @@ class LangChainService:
         Args:
             model_key: 模型标识符
             model_config: 模型配置字典
+            upper_environ: 可选，环境变量名已转为大写的环境变量字典，用于不区分大小写地查找 API Key
         
         Returns:
             ChatTongyi: 模型实例
@@ -50,19 +58,9 @@ class LangChainService:
         Raises:
             ValueError: 当 API Key 未配置或模型创建失败时抛出异常
         """
-        # 从环境变量读取 API Key
+        # 从环境变量读取 API Key（首次读取后由 settings 缓存）
         api_key_env_name = self._get_api_key_env_name(model_key)
-        dashscope_api_key = os.getenv(api_key_env_name, "")
-        
-        # 如果环境变量未设置，尝试不区分大小写查找
-        if not dashscope_api_key:
-            # pydantic-settings 默认不区分大小写，但 os.getenv 区分大小写
-            # 尝试查找所有可能的大小写组合
-            for key, value in os.environ.items():
-                if key.upper() == api_key_env_name.upper():
-                    dashscope_api_key = value
-                    logger.debug(f"找到环境变量（不区分大小写）: {key} -> {api_key_env_name}")
-                    break
+        dashscope_api_key = settings.get_api_key(model_key, upper_environ)
         
         if not dashscope_api_key:
             error_msg = (
@@ -98,30 +96,35 @@ class LangChainService:
             return
         
         initialized_count = 0
+        # 只遍历一次 os.environ，所有模型共用，避免每个模型都遍历一遍
+        upper_environ = get_upper_environ()
         
         for model_key, model_config in settings.llm_models_config.items():
             try:
                 provider = model_config.get("provider", "").lower()
                 
                 if provider == "tongyi":
-                    model_instance = self._create_tongyi_model(model_key, model_config)
+                    model_instance = self._create_tongyi_model(model_key, model_config, upper_environ)
                     self.models[model_key] = model_instance
                     initialized_count += 1
                     logger.info(
-                        f"模型初始化成功: key={model_key}, "
-                        f"provider={provider}, model={model_config.get('model_name')}"
+                        "模型初始化成功: key=%s, provider=%s, model=%s",
+                        model_key, provider, model_config.get("model_name")
                     )
                 else:
                     logger.warning(
-                        f"不支持的模型提供商: {provider}，跳过模型 {model_key}"
+                        "不支持的模型提供商: %s，跳过模型 %s", provider, model_key
                     )
             except Exception as e:
                 logger.warning(
-                    f"初始化模型 {model_key} 失败: {str(e)}。"
-                    f"请检查环境变量 {self._get_api_key_env_name(model_key)} 是否已配置"
+                    "初始化模型 %s 失败: %s。请检查环境变量 %s 是否已配置",
+                    model_key, e, self._get_api_key_env_name(model_key)
                 )
                 # 继续初始化其他模型，不中断整个流程
         
+        # 缓存默认模型标识符，避免每次调用都生成一次模型标识符列表
+        self._default_key = next(iter(self.models), None)
+        
         if initialized_count == 0:
             logger.warning(
                 "没有成功初始化的模型，LLM 功能将不可用。"
@@ -129,7 +132,7 @@ class LangChainService:
                 "API Key 环境变量命名规则：DASHSCOPE_API_KEY_{模型标识符}（大写，下划线分隔）"
             )
         else:
-            logger.info(f"LangChain 服务初始化完成，共初始化 {initialized_count} 个模型")
+            logger.info("LangChain 服务初始化完成，共初始化 %d 个模型", initialized_count)
     
     def _get_model(self, model_key: Optional[str] = None) -> BaseChatModel:
         """
@@ -156,8 +159,8 @@ class LangChainService:
         
         # 如果没有指定模型，使用第一个可用模型
         if not model_key:
-            model_key = list(self.models.keys())[0]
-            logger.debug(f"未指定模型，使用第一个可用模型: {model_key}")
+            model_key = self._default_key
+            logger.debug("未指定模型，使用第一个可用模型: %s", model_key)
         
         if model_key not in self.models:
             available_models = ", ".join(self.models.keys())
@@ -203,15 +206,11 @@ class LangChainService:
                     continue
                 
                 # 根据 role 创建对应的消息类型
-                if role == "user":
-                    formatted_messages.append(HumanMessage(content=content))
-                elif role == "assistant" or role == "ai":
-                    formatted_messages.append(AIMessage(content=content))
-                elif role == "system":
-                    formatted_messages.append(SystemMessage(content=content))
-                else:
-                    logger.warning(f"未知的消息角色: {role}，默认作为用户消息处理")
-                    formatted_messages.append(HumanMessage(content=content))
+                message_class = _ROLE_TO_MESSAGE_CLASS.get(role)
+                if message_class is None:
+                    logger.warning("未知的消息角色: %s，默认作为用户消息处理", role)
+                    message_class = HumanMessage
+                formatted_messages.append(message_class(content=content))
             else:
                 error_msg = f"不支持的消息格式: {type(msg)}，应为 str 或 dict"
                 logger.error(error_msg)
@@ -248,8 +247,8 @@ class LangChainService:
             formatted_messages = self._format_messages(messages)
             
             # 调用模型
-            used_model_key = model_key or list(self.models.keys())[0]
-            logger.debug(f"调用 LLM 模型: key={used_model_key}")
+            used_model_key = model_key or self._default_key
+            logger.debug("调用 LLM 模型: key=%s", used_model_key)
             response = await llm.ainvoke(formatted_messages)
             
             # 提取文本内容
@@ -258,7 +257,7 @@ class LangChainService:
             else:
                 result = str(response)
             
-            logger.debug(f"LLM 调用成功: model={used_model_key}, 返回结果长度={len(result)}")
+            logger.debug("LLM 调用成功: model=%s, 返回结果长度=%d", used_model_key, len(result))
             return result
             
         except ValueError:
@@ -298,8 +297,8 @@ class LangChainService:
             formatted_messages = self._format_messages(messages)
             
             # 流式调用模型
-            used_model_key = model_key or list(self.models.keys())[0]
-            logger.debug(f"流式调用 LLM 模型: key={used_model_key}")
+            used_model_key = model_key or self._default_key
+            logger.debug("流式调用 LLM 模型: key=%s", used_model_key)
             
             async for chunk in llm.astream(formatted_messages):
                 # 提取文本内容
@@ -342,7 +341,7 @@ class LangChainService:
             }
         
         # 确定使用的模型标识符
-        target_model_key = model_key or list(self.models.keys())[0]
+        target_model_key = model_key or self._default_key
         
         if target_model_key not in self.models:
             available_models = list(self.models.keys())
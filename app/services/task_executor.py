@@ -30,7 +30,32 @@ class TaskExecutor:
             raise ValueError(f"任务类 {task_class.__name__} 必须继承自 BaseTask")
         
         self._task_types[task_type.value] = task_class
-        logger.info(f"注册任务类型: task_type={task_type.value} ({task_type.name_cn}), class={task_class.__name__}")
+        logger.info(
+            "注册任务类型: task_type=%s (%s), class=%s",
+            task_type.value, task_type.name_cn, task_class.__name__
+        )
+    
+    def register_task_types(self, task_types: Dict[TaskType, Type[BaseTask]]) -> None:
+        """
+        批量注册任务类型
+        
+        Args:
+            task_types: 任务类型枚举值到任务类的映射（任务类必须继承自 BaseTask）
+        """
+        for task_class in task_types.values():
+            if not issubclass(task_class, BaseTask):
+                raise ValueError(f"任务类 {task_class.__name__} 必须继承自 BaseTask")
+        
+        self._task_types.update(
+            {task_type.value: task_class for task_type, task_class in task_types.items()}
+        )
+        logger.info(
+            "注册任务类型: %s",
+            ", ".join(
+                f"{task_type.value} ({task_type.name_cn})={task_class.__name__}"
+                for task_type, task_class in task_types.items()
+            )
+        )
     
     async def execute_task(
         self,
@@ -46,8 +71,8 @@ class TaskExecutor:
         1. 更新任务状态为 RUNNING
         2. 根据任务类型获取对应的任务类
         3. 创建任务实例并执行
-        4. 执行成功：更新状态为 SUCCESS，保存结果，触发回调，删除任务
-        5. 执行失败：更新状态为 FAILED，保存错误信息，触发回调，删除任务
+        4. 执行成功：更新状态为 SUCCESS，保存结果，删除任务，触发回调
+        5. 执行失败：更新状态为 FAILED，保存错误信息，删除任务，触发回调
         
         Args:
             task_id: 任务ID
@@ -61,7 +86,7 @@ class TaskExecutor:
         try:
             # 1. 更新任务状态为 RUNNING
             await task_manager_instance.update_status(task_id, TaskStatus.RUNNING)
-            logger.info(f"开始执行任务: task_id={task_id}, task_type={task_type}")
+            logger.info("开始执行任务: task_id=%s, task_type=%s", task_id, task_type)
             
             # 2. 根据任务类型获取对应的任务类
             task_class = self._task_types.get(task_type)
@@ -81,14 +106,10 @@ class TaskExecutor:
             
             result = await task_instance.execute()
             
-            # 4. 执行成功：更新状态为 SUCCESS，保存结果
-            await task_manager_instance.update_status(task_id, TaskStatus.SUCCESS)
-            await task_manager_instance.update_result(task_id, result)
-            
-            # 获取任务信息用于回调
-            task = await task_manager_instance.get_task(task_id)
+            # 4. 执行成功：更新状态为 SUCCESS，保存结果，并删除任务
+            task = await task_manager_instance.finish_task(task_id, TaskStatus.SUCCESS, result)
             if task:
-                logger.info(f"任务执行成功: task_id={task_id}")
+                logger.info("任务执行成功: task_id=%s", task_id)
                 
                 # 触发回调（使用固定配置）
                 await callback_service.callback(
@@ -97,51 +118,49 @@ class TaskExecutor:
                     output=result,
                     progress=task.progress
                 )
-                
-                # 删除任务
-                await task_manager_instance.delete_task(task_id)
+        
+        except CustomException as e:
+            # 5. 执行失败：CustomException 保存错误码和错误消息
+            logger.error(
+                "任务执行失败: task_id=%s, code=%s, error=%s", task_id, e.code, e.message,
+                exc_info=False
+            )
+            await self._fail_task(
+                task_manager_instance, task_id, {"error": e.message, "code": e.code}
+            )
         
         except Exception as e:
-            # 5. 执行失败：更新状态为 FAILED，保存错误信息
-            # 判断是否是 CustomException，如果是则保存错误码和错误消息
-            if isinstance(e, CustomException):
-                error_output = {
-                    "error": e.message,
-                    "code": e.code
-                }
-                await task_manager_instance.update_status(task_id, TaskStatus.FAILED)
-                await task_manager_instance.update_result(task_id, error_output)
-                
-                logger.error(
-                    f"任务执行失败: task_id={task_id}, code={e.code}, error={e.message}",
-                    exc_info=False
-                )
-            else:
-                # 普通异常，只保存错误消息
-                error_message = str(e)
-                await task_manager_instance.update_status(task_id, TaskStatus.FAILED)
-                await task_manager_instance.update_error(task_id, error_message)
-                
-                logger.error(
-                    f"任务执行失败: task_id={task_id}, error={error_message}",
-                    exc_info=False
-                )
-                error_output = {"error": error_message}
-            
-            # 获取任务信息用于回调
-            task = await task_manager_instance.get_task(task_id)
-            if task:
-                # 触发回调（使用固定配置）
-                await callback_service.callback(
-                    task_id=task_id,
-                    status=TaskStatus.FAILED,
-                    output=error_output,
-                    progress=task.progress
-                )
-                
-                # 删除任务
-                await task_manager_instance.delete_task(task_id)
-
+            # 5. 执行失败：普通异常，只保存错误消息
+            error_message = str(e)
+            logger.error(
+                "任务执行失败: task_id=%s, error=%s", task_id, error_message,
+                exc_info=False
+            )
+            await self._fail_task(task_manager_instance, task_id, {"error": error_message})
+    
+    async def _fail_task(
+        self,
+        task_manager_instance: TaskManager,
+        task_id: str,
+        error_output: Dict[str, Any]
+    ) -> None:
+        """
+        任务执行失败：更新状态为 FAILED，保存错误信息，删除任务，触发回调
+        
+        Args:
+            task_manager_instance: 任务管理器实例
+            task_id: 任务ID
+            error_output: 错误信息
+        """
+        task = await task_manager_instance.finish_task(task_id, TaskStatus.FAILED, error_output)
+        if task:
+            # 触发回调（使用固定配置）
+            await callback_service.callback(
+                task_id=task_id,
+                status=TaskStatus.FAILED,
+                output=error_output,
+                progress=task.progress
+            )
 
 # 全局任务执行器实例
 task_executor = TaskExecutor()
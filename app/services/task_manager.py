@@ -1,9 +1,10 @@
 """任务管理器模块"""
-import asyncio
+import time
 from typing import Dict, Optional, List
 from datetime import datetime
-from app.schemas.task import TaskResponse
+from app.schemas.task import TaskResponse, TaskResponseDict
 from app.constant.task_status import TaskStatus
+from app.config.config import settings
 from app.utils.logger import get_logger
 from app.utils.exceptions import CustomException
 from app.constant.error_code import ErrorCode
@@ -14,6 +15,18 @@ logger = get_logger("app")
 class Task:
     """任务数据类"""
     
+    # 使用 __slots__，每个任务实例不再携带 __dict__，减少内存占用
+    __slots__ = (
+        "task_id",
+        "task_type",
+        "status",
+        "progress",
+        "input",
+        "output",
+        "created_at",
+        "updated_at",
+    )
+    
     def __init__(
         self,
         task_id: str,
@@ -26,29 +39,73 @@ class Task:
         self.progress: Optional[str] = None
         self.input = input
         self.output: Optional[Dict] = None
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        # 时间使用 time.time() 时间戳保存，比 datetime.now() 开销小，返回响应时再转换为 datetime
+        now = time.time()
+        self.created_at = now
+        self.updated_at = now
     
     def to_response(self) -> TaskResponse:
-        """转换为响应模型"""
-        return TaskResponse(
+        """转换为响应模型（字段值都来自内部数据，使用 model_construct 跳过校验）"""
+        return TaskResponse.model_construct(
             task_id=self.task_id,
             task_type=self.task_type,
             status=self.status,
             progress=self.progress,
             input=self.input,
             output=self.output,
-            created_at=self.created_at,
-            updated_at=self.updated_at
+            created_at=datetime.fromtimestamp(self.created_at),
+            updated_at=datetime.fromtimestamp(self.updated_at)
         )
+    
+    def to_response_dict(self) -> TaskResponseDict:
+        """转换为响应字典（字段名使用别名），不构建 Pydantic 模型"""
+        return {
+            "taskId": self.task_id,
+            "taskType": self.task_type,
+            "status": self.status,
+            "progress": self.progress,
+            "input": self.input,
+            "output": self.output,
+            "createdAt": datetime.fromtimestamp(self.created_at),
+            "updatedAt": datetime.fromtimestamp(self.updated_at),
+        }
 
 
 class TaskManager:
-    """任务管理器，使用内存字典存储任务"""
+    """
+    任务管理器，使用内存字典存储任务
+    
+    所有任务都在同一个事件循环中处理，各方法内部没有 await，
+    对字典的读写不会被其他协程打断，因此无需加锁
+    """
     
-    def __init__(self):
+    __slots__ = ("_tasks", "_by_status", "_max_tasks")
+    
+    def __init__(self, max_tasks: Optional[int] = None):
+        """
+        初始化任务管理器
+        
+        Args:
+            max_tasks: 最多同时存在的任务数，0表示不限制，默认使用配置 max_concurrent_tasks
+        """
         self._tasks: Dict[str, Task] = {}
-        self._lock = asyncio.Lock()
+        # 任务结束后会立即删除，任务数即为正在处理的任务数，限制任务数即可限制内存占用
+        self._max_tasks = settings.max_concurrent_tasks if max_tasks is None else max_tasks
+        # 按状态索引的任务，按状态查询时无需遍历全部任务
+        self._by_status: Dict[TaskStatus, Dict[str, Task]] = {status: {} for status in TaskStatus}
+    
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """
+        修改任务状态，同时维护状态索引
+        
+        Args:
+            task: 任务对象
+            status: 新状态
+        """
+        if task.status != status:
+            self._by_status[task.status].pop(task.task_id, None)
+            self._by_status[status][task.task_id] = task
+        task.status = status
     
     async def create_task(
         self,
@@ -68,25 +125,33 @@ class TaskManager:
             Task: 创建的任务对象
         
         Raises:
-            CustomException: 如果任务ID已存在
-        """
-        async with self._lock:
-            if task_id in self._tasks:
-                logger.warning(f"任务ID已存在: {task_id}")
-                raise CustomException(
-                    code=ErrorCode.TASK_ID_EXISTS,
-                    message=f"任务ID已存在: {task_id}",
-                    status_code=400
-                )
-            
-            task = Task(
-                task_id=task_id,
-                task_type=task_type,
-                input=input
+            CustomException: 如果任务ID已存在，或任务数已达到上限
+        """
+        if self._max_tasks and len(self._tasks) >= self._max_tasks and task_id not in self._tasks:
+            logger.warning("任务数已达到上限: max_tasks=%s, task_id=%s", self._max_tasks, task_id)
+            raise CustomException(
+                code=ErrorCode.TASK_LIMIT_EXCEEDED,
+                message=f"任务数已达到上限: {self._max_tasks}",
+                status_code=429
             )
-            self._tasks[task_id] = task
-            logger.info(f"创建任务成功: task_id={task_id}, task_type={task_type}")
-            return task
+        
+        task = Task(
+            task_id=task_id,
+            task_type=task_type,
+            input=input
+        )
+        # setdefault 一次完成“检查是否存在”和“写入”
+        if self._tasks.setdefault(task_id, task) is not task:
+            logger.warning("任务ID已存在: %s", task_id)
+            raise CustomException(
+                code=ErrorCode.TASK_ID_EXISTS,
+                message=f"任务ID已存在: {task_id}",
+                status_code=400
+            )
+        self._by_status[task.status][task_id] = task
+        
+        logger.info("创建任务成功: task_id=%s, task_type=%s", task_id, task_type)
+        return task
     
     async def get_task(self, task_id: str) -> Optional[Task]:
         """
@@ -98,8 +163,7 @@ class TaskManager:
         Returns:
             Task: 任务对象，如果不存在则返回None
         """
-        async with self._lock:
-            return self._tasks.get(task_id)
+        return self._tasks.get(task_id)
     
     async def get_tasks(self, status: Optional[TaskStatus] = None) -> List[Task]:
         """
@@ -111,11 +175,9 @@ class TaskManager:
         Returns:
             List[Task]: 任务列表
         """
-        async with self._lock:
-            tasks = list(self._tasks.values())
-            if status:
-                tasks = [task for task in tasks if task.status == status]
-            return tasks
+        if status:
+            return list(self._by_status[status].values())
+        return list(self._tasks.values())
     
     async def update_status(self, task_id: str, status: TaskStatus) -> None:
         """
@@ -125,12 +187,11 @@ class TaskManager:
             task_id: 任务ID
             status: 新状态
         """
-        async with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
-                task.status = status
-                task.updated_at = datetime.now()
-                logger.info(f"更新任务状态: task_id={task_id}, status={status.value}")
+        task = self._tasks.get(task_id)
+        if task:
+            self._set_status(task, status)
+            task.updated_at = time.time()
+            logger.info("更新任务状态: task_id=%s, status=%s", task_id, status.value)
     
     async def update_result(self, task_id: str, result: Dict) -> None:
         """
@@ -140,12 +201,11 @@ class TaskManager:
             task_id: 任务ID
             result: 任务结果
         """
-        async with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
-                task.output = result
-                task.updated_at = datetime.now()
-                logger.info(f"更新任务结果: task_id={task_id}")
+        task = self._tasks.get(task_id)
+        if task:
+            task.output = result
+            task.updated_at = time.time()
+            logger.info("更新任务结果: task_id=%s", task_id)
     
     async def update_progress(self, task_id: str, info: str) -> None:
         """
@@ -155,12 +215,43 @@ class TaskManager:
             task_id: 任务ID
             info: 进度信息
         """
-        async with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
-                task.progress = info
-                task.updated_at = datetime.now()
-                logger.debug(f"更新任务进度: task_id={task_id}, info={info}")
+        task = self._tasks.get(task_id)
+        if task:
+            task.progress = info
+            task.updated_at = time.time()
+            logger.debug("更新任务进度: task_id=%s, info=%s", task_id, info)
+    
+    async def apply_progress(
+        self,
+        task_id: str,
+        info: str,
+        status: Optional[TaskStatus] = None
+    ) -> Optional[TaskStatus]:
+        """
+        更新任务进度，可选择同时更新状态
+        
+        一次完成状态和进度的更新并返回当前状态，代替依次调用
+        update_status、update_progress、get_task
+        
+        Args:
+            task_id: 任务ID
+            info: 进度信息
+            status: 可选的新状态
+        
+        Returns:
+            TaskStatus: 更新后的任务状态，如果任务不存在则返回None
+        """
+        task = self._tasks.get(task_id)
+        if not task:
+            return None
+        
+        if status is not None:
+            self._set_status(task, status)
+            logger.info("更新任务状态: task_id=%s, status=%s", task_id, status.value)
+        task.progress = info
+        task.updated_at = time.time()
+        logger.debug("更新任务进度: task_id=%s, info=%s", task_id, info)
+        return task.status
     
     async def update_error(self, task_id: str, error: str) -> None:
         """
@@ -170,12 +261,40 @@ class TaskManager:
             task_id: 任务ID
             error: 错误信息
         """
-        async with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
-                task.output = {"error": error}
-                task.updated_at = datetime.now()
-                logger.warning(f"更新任务错误: task_id={task_id}, error={error}")
+        task = self._tasks.get(task_id)
+        if task:
+            task.output = {"error": error}
+            task.updated_at = time.time()
+            logger.warning("更新任务错误: task_id=%s, error=%s", task_id, error)
+    
+    async def finish_task(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        output: Dict
+    ) -> Optional[Task]:
+        """
+        结束任务：更新最终状态和结果，并从任务列表中移除
+        
+        一次完成状态更新、结果保存和删除，代替依次调用
+        update_status、update_result、get_task、delete_task
+        
+        Args:
+            task_id: 任务ID
+            status: 最终状态（SUCCESS 或 FAILED）
+            output: 任务结果或错误信息
+        
+        Returns:
+            Task: 结束后的任务对象（已从任务列表中移除），如果不存在则返回None
+        """
+        task = self._tasks.pop(task_id, None)
+        if task:
+            self._by_status[task.status].pop(task_id, None)
+            task.status = status
+            task.output = output
+            task.updated_at = time.time()
+            logger.info("结束任务: task_id=%s, status=%s", task_id, status.value)
+        return task
     
     async def delete_task(self, task_id: str) -> None:
         """
@@ -184,10 +303,10 @@ class TaskManager:
         Args:
             task_id: 任务ID
         """
-        async with self._lock:
-            if task_id in self._tasks:
-                del self._tasks[task_id]
-                logger.info(f"删除任务: task_id={task_id}")
+        task = self._tasks.pop(task_id, None)
+        if task:
+            self._by_status[task.status].pop(task_id, None)
+            logger.info("删除任务: task_id=%s", task_id)
 
 
 # 全局任务管理器实例
@@ -34,24 +34,18 @@ class BaseTask(ABC):
         Args:
             progress: 进度更新参数对象
         """
-        # 如果提供了状态，先更新状态
-        if progress.status is not None:
-            await self.task_manager.update_status(self.task_id, progress.status)
-        
-        # 更新进度
-        await self.task_manager.update_progress(self.task_id, progress.info)
+        # 更新进度（如果提供了状态，同时更新状态），返回当前任务状态
+        current_status = await self.task_manager.apply_progress(
+            self.task_id, progress.info, progress.status
+        )
         
         # 触发回调
-        if progress.trigger_callback:
-            # 获取当前任务状态（如果没提供status参数，使用当前状态）
-            task = await self.task_manager.get_task(self.task_id)
-            if task:
-                current_status = progress.status if progress.status is not None else task.status
-                await callback_service.callback(
-                    task_id=self.task_id,
-                    status=current_status,
-                    progress=progress.info
-                )
+        if progress.trigger_callback and current_status is not None:
+            await callback_service.callback(
+                task_id=self.task_id,
+                status=current_status,
+                progress=progress.info
+            )
     
     @abstractmethod
     async def execute(self) -> Dict[str, Any]:
@@ -18,7 +18,7 @@ class ImageToOrderTask(BaseTask):
         Returns:
             Dict[str, Any]: 任务执行结果（空数据，待补充）
         """
-        logger.info(f"开始执行图片转订单任务: task_id={self.task_id}")
+        logger.info("开始执行图片转订单任务: task_id=%s", self.task_id)
         
         # 更新进度
         await self.update_progress(ProgressUpdate(info="开始处理图片..."))
@@ -29,7 +29,7 @@ class ImageToOrderTask(BaseTask):
         # 更新进度
         await self.update_progress(ProgressUpdate(info="处理完成"))
         
-        logger.info(f"图片转订单任务完成: task_id={self.task_id}")
+        logger.info("图片转订单任务完成: task_id=%s", self.task_id)
         
         # 返回空数据
         return {}
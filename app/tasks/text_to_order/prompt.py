@@ -170,3 +170,23 @@ text_to_order_prompt = PromptTemplate(
     input_variables=["user_input"],
     template=TEXT_TO_ORDER_PROMPT_TEMPLATE,
 )
+
+# 模板中只有 {user_input} 一个变量，模块加载时先渲染出变量前后两部分，
+# 格式化时直接拼接字符串，无需每次经过 PromptTemplate.format
+_USER_INPUT_MARKER = "\x00user_input\x00"
+TEXT_TO_ORDER_PROMPT_PREFIX, TEXT_TO_ORDER_PROMPT_SUFFIX = TEXT_TO_ORDER_PROMPT_TEMPLATE.format(
+    user_input=_USER_INPUT_MARKER
+).split(_USER_INPUT_MARKER)
+
+
+def format_text_to_order_prompt(user_input: str) -> str:
+    """
+    格式化文本转订单的 Prompt，结果与 text_to_order_prompt.format(user_input=...) 一致
+    
+    Args:
+        user_input: 用户输入的文本
+    
+    Returns:
+        str: 格式化后的 Prompt
+    """
+    return TEXT_TO_ORDER_PROMPT_PREFIX + user_input + TEXT_TO_ORDER_PROMPT_SUFFIX
@@ -1,18 +1,84 @@
 """文本转订单任务实现"""
+import asyncio
+import bisect
+import itertools
 import json
+import logging
 import re
+import orjson
 from typing import Dict, Any, List
+from pydantic import ValidationError
 from app.tasks.base import BaseTask
 from app.schemas.task import ProgressUpdate
+from app.schemas.order import OrderOutput
 from app.constant.task_status import TaskStatus
 from app.utils.logger import get_logger
 from app.utils.exceptions import CustomException
 from app.constant.error_code import ErrorCode
 from app.services.llm_service import llm_service
-from app.tasks.text_to_order.prompt import text_to_order_prompt
+from app.utils.llm_cache import llm_cache
+from app.tasks.text_to_order.prompt import format_text_to_order_prompt
 
 logger = get_logger("app")
 
+# 商品分隔符：顿号、逗号、换行符、分号、句号
+_SEPARATOR_RE = re.compile(r"[、，,\n；;。]")
+
+# JSON 解码器，用于从任意位置开始解析一个 JSON 值（raw_decode）
+_JSON_DECODER = json.JSONDecoder()
+
+
+# 商品字段校验失败时的错误信息（缺少字段的情况单独处理）
+_PRODUCT_FIELD_ERROR_MESSAGES = {
+    "name": "商品格式错误：name 必须是非空字符串",
+    "quantity": "商品格式错误：quantity 必须是数字（整数或小数）",
+    "unit": "商品格式错误：unit 必须是非空字符串",
+    "price": "商品格式错误：price 必须是数字或 null",
+    "remark": "商品格式错误：remark 必须是字符串或 null",
+}
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """
+    将 Pydantic 校验错误转换为中文错误信息
+    
+    与逐个商品校验时的报错一致：只报告第一个出错的商品，
+    同一个商品优先报告缺少的字段，否则按字段顺序取第一个错误
+    
+    Args:
+        error: Pydantic 校验错误
+    
+    Returns:
+        str: 错误信息，如 "商品格式错误：quantity 必须大于0"
+    """
+    errors = error.errors(include_url=False)
+    
+    # 整个输出或 products 字段本身的错误（此时不会再有商品的错误）
+    loc = errors[0]["loc"]
+    if len(loc) < 2:
+        # 输出不是对象时，同样视为缺少 products 字段
+        if not loc or errors[0]["type"] == "missing":
+            return "输出格式错误：缺少 'products' 字段"
+        return "输出格式错误：'products' 必须是数组"
+    
+    # 只看第一个出错的商品
+    product_index = min(e["loc"][1] for e in errors)
+    product_errors = [e for e in errors if e["loc"][1] == product_index]
+    first_error = next((e for e in product_errors if e["type"] == "missing"), product_errors[0])
+    loc = first_error["loc"]
+    
+    # products 中的元素不是对象
+    if len(loc) == 2:
+        return f"输出格式错误：products[{loc[1]}] 必须是对象"
+    
+    # 商品字段的错误
+    field = loc[2]
+    if first_error["type"] == "missing":
+        return f"商品格式错误：缺少必需字段 '{field}'"
+    if field == "quantity" and first_error["type"] == "greater_than":
+        return "商品格式错误：quantity 必须大于0"
+    return _PRODUCT_FIELD_ERROR_MESSAGES.get(field, f"商品格式错误：{field} 格式不正确")
+
 
 class TextToOrderTask(BaseTask):
     """文本转订单任务"""
@@ -22,68 +88,8 @@ class TextToOrderTask(BaseTask):
     # 中文字符通常1个字符≈1-2个tokens，这里按1.5倍估算，设置安全阈值为3000字符
     MAX_INPUT_LENGTH = 3000  # 单次处理的最大输入长度（字符数）
     CHUNK_SIZE = 2500  # 分块大小（字符数），略小于MAX_INPUT_LENGTH以留出安全余量
-    
-    def _validate_product_format(self, product: Dict[str, Any]) -> None:
-        """
-        校验单个商品格式
-        
-        Args:
-            product: 商品字典
-            
-        Raises:
-            CustomException: 格式不正确时抛出异常
-        """
-        required_fields = ["name", "quantity", "unit"]
-        for field in required_fields:
-            if field not in product:
-                raise CustomException(
-                    code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                    message=f"商品格式错误：缺少必需字段 '{field}'"
-                )
-        
-        # 校验 name 必须是字符串且不为空
-        if not isinstance(product["name"], str) or not product["name"].strip():
-            raise CustomException(
-                code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="商品格式错误：name 必须是非空字符串"
-            )
-        
-        # 校验 quantity 必须是数字（整数或浮点数）且大于0
-        if not isinstance(product["quantity"], (int, float)):
-            raise CustomException(
-                code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="商品格式错误：quantity 必须是数字（整数或小数）"
-            )
-        if product["quantity"] <= 0:
-            raise CustomException(
-                code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="商品格式错误：quantity 必须大于0"
-            )
-        
-        # 校验 unit 必须是字符串且不为空
-        if not isinstance(product["unit"], str) or not product["unit"].strip():
-            raise CustomException(
-                code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="商品格式错误：unit 必须是非空字符串"
-            )
-        
-        # 校验 price：如果存在，必须是数字（int或float）或 None/null
-        if "price" in product:
-            price = product["price"]
-            if price is not None and not isinstance(price, (int, float)):
-                raise CustomException(
-                    code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                    message="商品格式错误：price 必须是数字或 null"
-                )
-        
-        # 校验 remark：如果存在，必须是字符串或 None/null
-        if "remark" in product:
-            remark = product["remark"]
-            if remark is not None and not isinstance(remark, str):
-                raise CustomException(
-                    code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                    message="商品格式错误：remark 必须是字符串或 null"
-                )
+    MAX_PARALLEL_CHUNKS = 8  # 同时处理的文本块数上限，避免超出模型服务的并发限制
+    MODEL_KEY = "qwen-plus"  # 使用的模型标识符，此处切换模型
     
     def _validate_output_format(self, output: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,67 +104,19 @@ class TextToOrderTask(BaseTask):
         Raises:
             CustomException: 格式不正确时抛出异常
         """
-        # 检查是否有 products 字段
-        if "products" not in output:
-            raise CustomException(
-                code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="输出格式错误：缺少 'products' 字段"
-            )
-        
-        # 检查 products 是否为列表
-        if not isinstance(output["products"], list):
+        # 使用 Pydantic 模型校验（校验逻辑在 pydantic-core 中执行），并规范化商品数据
+        try:
+            validated_output = OrderOutput.model_validate(output)
+        except ValidationError as e:
             raise CustomException(
                 code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                message="输出格式错误：'products' 必须是数组"
+                message=_format_validation_error(e)
             )
         
-        # 如果 products 为空数组，直接返回（允许空数组）
-        if len(output["products"]) == 0:
-            logger.info(f"未识别到商品信息: task_id={self.task_id}")
-            return {"products": []}
-        
-        # 规范化每个商品
-        normalized_products = []
-        for idx, product in enumerate(output["products"]):
-            if not isinstance(product, dict):
-                raise CustomException(
-                    code=ErrorCode.OUTPUT_FORMAT_ERROR,
-                    message=f"输出格式错误：products[{idx}] 必须是对象"
-                )
-            
-            # 校验商品格式
-            self._validate_product_format(product)
-            
-            # 规范化商品数据
-            normalized_product = {
-                "name": product["name"].strip(),
-                "quantity": product["quantity"],
-                "unit": product["unit"].strip(),
-                "price": product.get("price") if product.get("price") is not None else None,
-                "remark": product.get("remark") if product.get("remark") is not None else None,
-            }
-            
-            normalized_products.append(normalized_product)
-        
-        return {"products": normalized_products}
-    
-    def _estimate_token_count(self, text: str) -> int:
-        """
-        估算文本的token数量（粗略估算）
+        if not validated_output.products:
+            logger.info("未识别到商品信息: task_id=%s", self.task_id)
         
-        对于中文文本，通常：
-        - 1个中文字符 ≈ 1-2个tokens
-        - 1个英文字符/单词 ≈ 0.5-1个tokens
-        
-        这里使用保守估算：字符数 * 1.5
-        
-        Args:
-            text: 输入文本
-            
-        Returns:
-            int: 估算的token数量
-        """
-        return int(len(text) * 1.5)
+        return validated_output.model_dump()
     
     def _split_text_into_chunks(self, text: str) -> List[str]:
         """
@@ -174,10 +132,10 @@ class TextToOrderTask(BaseTask):
         if len(text) <= self.CHUNK_SIZE:
             return [text]
         
-        chunks = []
-        # 商品分隔符：顿号、逗号、换行符、分号等
-        separators = ['、', '，', ',', '\n', '；', ';', '。']
+        # 一次找出所有商品分隔符（顿号、逗号、换行符、分号等）之后的位置，分块时二分查找
+        split_offsets = [match.end() for match in _SEPARATOR_RE.finditer(text)]
         
+        chunks = []
         current_pos = 0
         text_length = len(text)
         
@@ -192,23 +150,15 @@ class TextToOrderTask(BaseTask):
                     chunks.append(remaining_text)
                 break
             
-            # 尝试在分隔符处分割，找到最接近chunk_end的分隔符
-            best_split_pos = chunk_end
-            for sep in separators:
-                # 从chunk_end向前查找分隔符
-                sep_pos = text.rfind(sep, current_pos, chunk_end)
-                if sep_pos != -1 and sep_pos > current_pos:
-                    # 找到分隔符，在分隔符后分割（包含分隔符）
-                    best_split_pos = sep_pos + len(sep)
-                    break
-            
+            # 在分隔符后分割（包含分隔符），优先使用 chunk_end 之前最接近的分隔符
+            idx = bisect.bisect_right(split_offsets, chunk_end)
+            if idx > 0 and split_offsets[idx - 1] > current_pos + 1:
+                best_split_pos = split_offsets[idx - 1]
             # 如果没找到合适的分隔符，尝试向后查找（最多向后查找500字符）
-            if best_split_pos == chunk_end:
-                for sep in separators:
-                    sep_pos = text.find(sep, chunk_end, min(chunk_end + 500, text_length))
-                    if sep_pos != -1:
-                        best_split_pos = sep_pos + len(sep)
-                        break
+            elif idx < len(split_offsets) and split_offsets[idx] <= min(chunk_end + 500, text_length):
+                best_split_pos = split_offsets[idx]
+            else:
+                best_split_pos = chunk_end
             
             # 提取当前块
             chunk = text[current_pos:best_split_pos].strip()
@@ -232,44 +182,98 @@ class TextToOrderTask(BaseTask):
             Dict[str, Any]: 解析后的商品列表
         """
         # 使用 prompt 模板格式化输入
-        formatted_prompt = text_to_order_prompt.format(user_input=chunk)
-        
-        logger.debug(
-            f"处理文本块 {chunk_index + 1}/{total_chunks}: "
-            f"长度={len(chunk)}, 内容预览={chunk[:50]}..."
-        )
+        formatted_prompt = format_text_to_order_prompt(chunk)
+        
+        # 开启缓存且相同的文本之前已经识别过时，直接使用缓存的结果
+        # 未开启缓存时不生成缓存键，省去对整个 Prompt 计算哈希
+        cache_key = None
+        if llm_cache.enabled:
+            cache_key = llm_cache.make_key(self.MODEL_KEY, formatted_prompt)
+            cached_output = llm_cache.get(cache_key)
+            if cached_output is not None:
+                logger.debug("文本块 %d/%d 命中缓存", chunk_index + 1, total_chunks)
+                return cached_output
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "处理文本块 %d/%d: 长度=%d, 内容预览=%s...",
+                chunk_index + 1, total_chunks, len(chunk), chunk[:50]
+            )
         
         # 调用 LLM 模型
         llm_result = await llm_service.invoke(
             [{"role": "user", "content": formatted_prompt}],
-            model_key="qwen-plus"
+            model_key=self.MODEL_KEY
         )
         
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("LLM 返回结果: %s...", llm_result[:200])
+        
         # 从 LLM 返回结果中提取 JSON
         raw_output = self._extract_json_from_text(llm_result)
         
         # 校验并规范化输出格式
         validated_output = self._validate_output_format(raw_output)
         
+        # 只缓存校验通过的结果
+        if cache_key is not None:
+            llm_cache.set(cache_key, validated_output)
+        
         return validated_output
     
+    async def _process_text_chunks(self, chunks: List[str]) -> Dict[str, Any]:
+        """
+        并发处理多个文本块并合并结果
+        
+        各文本块的 LLM 调用互不依赖，并发执行，总耗时约等于最慢的一块；
+        同时处理的块数不超过 MAX_PARALLEL_CHUNKS。
+        使用 TaskGroup，任意一块失败时会取消其余还未完成的块，不再继续调用 LLM
+        
+        Args:
+            chunks: 文本块列表
+            
+        Returns:
+            Dict[str, Any]: 合并后的结果，商品顺序与文本块顺序一致
+            
+        Raises:
+            Exception: 第一个失败的文本块抛出的异常
+        """
+        total_chunks = len(chunks)
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_CHUNKS)
+        
+        async def process(chunk: str, chunk_index: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._process_text_chunk(chunk, chunk_index, total_chunks)
+        
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                chunk_tasks = [
+                    task_group.create_task(process(chunk, chunk_index))
+                    for chunk_index, chunk in enumerate(chunks)
+                ]
+        except ExceptionGroup as e:
+            # TaskGroup 会把异常包装为 ExceptionGroup，取出第一个异常，保持与单块处理时相同的错误信息（from None：不再附带 ExceptionGroup，避免日志中重复记录）
+            raise e.exceptions[0] from None
+        
+        return self._merge_chunk_results([chunk_task.result() for chunk_task in chunk_tasks])
+    
     def _merge_chunk_results(self, chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         合并多个文本块的处理结果
         
+        各文本块的结果在 _process_text_chunk 中已经校验并规范化过，这里只拼接商品列表，不再重复检查
+        
         Args:
             chunk_results: 各文本块的处理结果列表
             
         Returns:
             Dict[str, Any]: 合并后的结果
         """
-        merged_products = []
-        
-        for chunk_result in chunk_results:
-            if "products" in chunk_result and isinstance(chunk_result["products"], list):
-                merged_products.extend(chunk_result["products"])
-        
-        return {"products": merged_products}
+        return {
+            "products": list(itertools.chain.from_iterable(
+                chunk_result["products"] for chunk_result in chunk_results
+            ))
+        }
     
     def _extract_json_from_text(self, text: str) -> Dict[str, Any]:
         """
@@ -284,52 +288,37 @@ class TextToOrderTask(BaseTask):
         Raises:
             CustomException: 解析失败时抛出异常
         """
-        # 尝试直接解析整个文本
-        try:
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
-            pass
-        
-        # 尝试提取代码块中的 JSON（支持多行）
-        # 先尝试匹配 ```json ... ``` 格式
-        json_block_pattern = r'```json\s*(\{.*?\})\s*```'
-        matches = re.findall(json_block_pattern, text, re.DOTALL)
-        for match in matches:
-            try:
-                return json.loads(match.strip())
-            except json.JSONDecodeError:
-                continue
+        pos = text.find("{")
         
-        # 尝试匹配 ``` ... ``` 格式（没有 json 标记）
-        code_block_pattern = r'```\s*(\{.*?\})\s*```'
-        matches = re.findall(code_block_pattern, text, re.DOTALL)
-        for match in matches:
+        # 文本以 { 开头（忽略空白）时，尝试直接解析整个文本（orjson 会忽略首尾空白，无需先 strip 复制一份文本）
+        # LLM 通常返回 ```json ``` 代码块，此时整体解析必然失败，直接跳过
+        if pos != -1 and not text[:pos].strip():
+            try:
+                obj = orjson.loads(text)
+            except orjson.JSONDecodeError:
+                pass
+            else:
+                if type(obj) is dict:
+                    return obj
+        
+        # 从每个 { 开始尝试解析一个 JSON 对象（可以跳过 ```json ``` 代码块标记和前后的说明文字）
+        # 优先返回包含 products 字段的对象，否则返回第一个解析成功的对象
+        first_obj = None
+        while pos != -1:
             try:
-                return json.loads(match.strip())
+                obj, end = _JSON_DECODER.raw_decode(text, pos)
             except json.JSONDecodeError:
+                pos = text.find("{", pos + 1)
                 continue
-        
-        # 尝试匹配第一个完整的 JSON 对象（支持多行）
-        # 使用更智能的方法：找到第一个 { 和最后一个匹配的 }
-        brace_start = text.find('{')
-        if brace_start != -1:
-            brace_count = 0
-            brace_end = -1
-            for i in range(brace_start, len(text)):
-                if text[i] == '{':
-                    brace_count += 1
-                elif text[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        brace_end = i
-                        break
             
-            if brace_end != -1:
-                json_str = text[brace_start:brace_end + 1]
-                try:
-                    return json.loads(json_str.strip())
-                except json.JSONDecodeError:
-                    pass
+            if "products" in obj:
+                return obj
+            if first_obj is None:
+                first_obj = obj
+            pos = text.find("{", end)
+        
+        if first_obj is not None:
+            return first_obj
         
         # 如果都失败了，抛出异常
         raise CustomException(
@@ -351,7 +340,7 @@ class TextToOrderTask(BaseTask):
         Raises:
             Exception: 任务执行失败时抛出异常，会被 TaskExecutor 捕获并处理
         """
-        logger.info(f"开始执行文本转订单任务: task_id={self.task_id}")
+        logger.info("开始执行文本转订单任务: task_id=%s", self.task_id)
         
         # 获取输入参数
         text = self.task_params.get("text", "")
@@ -377,34 +366,29 @@ class TextToOrderTask(BaseTask):
         ))
         
         try:
-            # 使用 prompt 模板格式化输入
-            formatted_prompt = text_to_order_prompt.format(user_input=text)
-            
-            logger.debug(f"调用 LLM 解析文本: text={text[:100]}...")
-            
-            # 调用 LLM 模型
-            llm_result = await llm_service.invoke(
-                [{"role": "user", "content": formatted_prompt}],
-                model_key="qwen-plus"  # 此处切换模型
-            )
-            
-            logger.debug(f"LLM 返回结果: {llm_result[:200]}...")
-            
-            # 从 LLM 返回结果中提取 JSON
-            raw_output = self._extract_json_from_text(llm_result)
-            
-            # 校验并规范化输出格式
-            validated_output = self._validate_output_format(raw_output)
+            if len(text) > self.MAX_INPUT_LENGTH:
+                # 文本过长，分块后并发处理
+                chunks = self._split_text_into_chunks(text)
+                logger.info(
+                    "文本较长，分块处理: task_id=%s, 字符数=%d, 阈值=%d, 块数=%d",
+                    self.task_id, len(text), self.MAX_INPUT_LENGTH, len(chunks)
+                )
+                await self.update_progress(ProgressUpdate(
+                    info=f"文本较长，分为 {len(chunks)} 块识别"
+                ))
+                validated_output = await self._process_text_chunks(chunks)
+            else:
+                validated_output = await self._process_text_chunk(text, 0, 1)
             
             logger.info(
-                f"文本转订单解析成功: task_id={self.task_id}, "
-                f"商品数量={len(validated_output['products'])}"
+                "文本转订单解析成功: task_id=%s, 商品数量=%d",
+                self.task_id, len(validated_output["products"])
             )
             
             # 最终进度更新
             await self.update_progress(ProgressUpdate(info="处理完成"))
             
-            logger.info(f"文本转订单任务完成: task_id={self.task_id}")
+            logger.info("文本转订单任务完成: task_id=%s", self.task_id)
             
             # 返回任务结果
             return validated_output
@@ -413,14 +397,14 @@ class TextToOrderTask(BaseTask):
             # CustomException 直接抛出
             raise
         except json.JSONDecodeError as e:
-            logger.error(f"JSON 解析失败: {str(e)}")
+            logger.error("JSON 解析失败: %s", e)
             raise CustomException(
                 code=ErrorCode.INPUT_FORMAT_ERROR,
                 message=f"LLM 返回结果格式错误，无法解析 JSON: {str(e)}"
             )
         except Exception as e:
-            logger.error(f"文本转订单任务执行失败: {str(e)}", exc_info=True)
+            logger.error("文本转订单任务执行失败: %s", e, exc_info=True)
             raise CustomException(
-                code=ErrorCode.INTERNAL_ERROR,
+                code=ErrorCode.TASK_EXECUTION_FAILED,
                 message=f"文本转订单任务执行失败: {str(e)}"
             )
@@ -2,6 +2,7 @@
 API Key 认证工具模块
 提供 API Key 验证的依赖项
 """
+import hmac
 from fastapi import Security
 from fastapi.security import APIKeyHeader
 from app.config.config import settings
@@ -17,6 +18,15 @@ api_key_header = APIKeyHeader(
     auto_error=False  # 设置为 False，手动处理错误以返回标准格式
 )
 
+# 配置的 API Key（字节串），模块加载时转换一次，用于常量时间比较
+_EXPECTED_API_KEY = settings.api_key.encode()
+# 没有配置 API Key 时跳过验证（开发环境）
+_DEV_MODE = not _EXPECTED_API_KEY
+
+if _DEV_MODE:
+    # 只在启动时提示一次，不再每个请求都记录
+    logger.warning("API Key 未配置，跳过认证验证（仅用于开发环境）")
+
 
 async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
     """
@@ -40,8 +50,7 @@ async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
         CustomException: 当 API Key 无效时抛出异常，使用项目标准错误格式
     """
     # 如果配置中没有设置 API Key，跳过验证（开发环境）
-    if not settings.api_key:
-        logger.warning("API Key 未配置，跳过认证验证（仅用于开发环境）")
+    if _DEV_MODE:
         return "dev_mode"
     
     # 检查是否提供了 API Key
@@ -53,14 +62,13 @@ async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
             status_code=401
         )
     
-    # 验证 API Key 是否匹配
-    if api_key != settings.api_key:
-        logger.warning(f"API Key 验证失败: {api_key[:10]}...")
+    # 验证 API Key 是否匹配（使用常量时间比较，避免通过响应时间推测 API Key）
+    if not hmac.compare_digest(api_key.encode(), _EXPECTED_API_KEY):
+        logger.warning("API Key 验证失败: %s...", api_key[:10])
         raise CustomException(
             code=ErrorCode.AUTH_INVALID_API_KEY,
             message="API Key 无效",
             status_code=401
         )
     
-    logger.debug("API Key 验证成功")
     return api_key
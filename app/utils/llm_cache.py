@@ -0,0 +1,93 @@
+"""
+LLM 结果缓存模块
+进程内的 LRU 缓存，相同模型、相同 Prompt 的请求直接返回之前的结果，省去 LLM 调用
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import orjson
+from app.config.config import settings
+
+
+class LLMCache:
+    """
+    LLM 结果缓存，按模型标识符和 Prompt 的哈希值缓存结果
+    
+    缓存值使用 orjson 序列化后的字节串保存，每次命中都会解析出新的对象，
+    调用方修改返回结果不会影响缓存内容
+    """
+    
+    def __init__(self, max_size: int, ttl: int):
+        """
+        初始化缓存
+        
+        Args:
+            max_size: 最多缓存的条目数，0表示不缓存
+            ttl: 缓存有效期（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # key 为缓存键，value 为（过期时间, 序列化后的结果）
+        self._items: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+    
+    @property
+    def enabled(self) -> bool:
+        """是否开启缓存（max_size 大于0），未开启时调用方可以跳过生成缓存键"""
+        return self.max_size > 0
+    
+    @staticmethod
+    def make_key(model_key: str, prompt: str) -> str:
+        """
+        生成缓存键
+        
+        Args:
+            model_key: 模型标识符
+            prompt: 完整的 Prompt
+        
+        Returns:
+            str: 缓存键（sha256 十六进制字符串）
+        """
+        return hashlib.sha256(f"{model_key}|{prompt}".encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        读取缓存
+        
+        Args:
+            key: 缓存键
+        
+        Returns:
+            Any: 缓存的结果，未命中或已过期时返回None
+        """
+        item = self._items.get(key)
+        if item is None:
+            return None
+        
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return None
+        
+        self._items.move_to_end(key)
+        return orjson.loads(value)
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+        
+        Args:
+            key: 缓存键
+            value: 结果，需为 orjson 可序列化的数据
+        """
+        if not self.enabled:
+            return
+        
+        self._items[key] = (time.monotonic() + self.ttl, orjson.dumps(value))
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+# 全局 LLM 结果缓存实例
+llm_cache = LLMCache(max_size=settings.llm_cache_size, ttl=settings.llm_cache_ttl)
@@ -2,11 +2,51 @@
 日志配置模块
 使用 Python 标准库 logging 实现日志记录到文件
 支持每日时间轮换
+日志先写入内存队列，由后台线程写入文件和控制台，记录日志时不会阻塞在磁盘 I/O 上
 """
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import TimedRotatingFileHandler
+from typing import List, Tuple
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# 已添加的队列处理器及其监听器（每个日志记录器一个）
+_queue_handlers: List[Tuple[logging.Logger, QueueHandler, QueueListener]] = []
+
+
+def _attach_queue_handler(logger: logging.Logger, *handlers: logging.Handler) -> None:
+    """
+    为日志记录器添加队列处理器，实际的处理器由后台线程执行
+    
+    每个日志记录器使用单独的队列和监听器，日志只会交给该记录器自己的处理器
+    
+    Args:
+        logger: 日志记录器
+        handlers: 实际写入日志的处理器（文件、控制台等）
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    # respect_handler_level=True：仍按各处理器自己的级别过滤
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _queue_handlers.append((logger, queue_handler, listener))
+
+
+def stop_logging() -> None:
+    """移除队列处理器并停止监听器，写完队列中剩余的日志后关闭处理器"""
+    while _queue_handlers:
+        logger, queue_handler, listener = _queue_handlers.pop()
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+# 进程退出时写完队列中剩余的日志
+atexit.register(stop_logging)
 
 
 def setup_logging(
@@ -24,6 +64,14 @@ def setup_logging(
         access_log_level: 访问日志级别
         backup_count: 保留的日志文件数量（天数）
     """
+    # 重复调用时，先停止之前的监听器
+    stop_logging()
+    
+    # 日志格式中没有用到线程、进程信息，关闭后创建每条日志记录时不再获取这些信息
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     # 创建日志目录
     log_path = Path(log_dir)
     log_path.mkdir(exist_ok=True)
@@ -42,6 +90,8 @@ def setup_logging(
     # ========== 配置应用日志 ==========
     app_logger = logging.getLogger("app")
     app_logger.setLevel(getattr(logging, app_log_level.upper()))
+    # 应用日志已有自己的文件和控制台处理器，不再向根日志记录器传递，避免同一条日志被重复处理
+    app_logger.propagate = False
     
     # 清除已有的处理器
     app_logger.handlers.clear()
@@ -56,7 +106,6 @@ def setup_logging(
     )
     app_file_handler.setLevel(getattr(logging, app_log_level.upper()))
     app_file_handler.setFormatter(detailed_formatter)
-    app_logger.addHandler(app_file_handler)
     
     # 应用错误日志文件处理器（单独记录 ERROR 及以上级别）
     error_file_handler = TimedRotatingFileHandler(
@@ -68,13 +117,12 @@ def setup_logging(
     )
     error_file_handler.setLevel(logging.ERROR)
     error_file_handler.setFormatter(detailed_formatter)
-    app_logger.addHandler(error_file_handler)
     
     # 控制台输出（可选，用于开发环境）
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, app_log_level.upper()))
     console_handler.setFormatter(simple_formatter)
-    app_logger.addHandler(console_handler)
+    _attach_queue_handler(app_logger, app_file_handler, error_file_handler, console_handler)
     
     # ========== 配置 Uvicorn 访问日志 ==========
     uvicorn_access_logger = logging.getLogger("uvicorn.access")
@@ -98,7 +146,7 @@ def setup_logging(
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     access_file_handler.setFormatter(access_formatter)
-    uvicorn_access_logger.addHandler(access_file_handler)
+    _attach_queue_handler(uvicorn_access_logger, access_file_handler)
     
     # ========== 配置 Uvicorn 错误日志 ==========
     uvicorn_error_logger = logging.getLogger("uvicorn.error")
@@ -114,7 +162,7 @@ def setup_logging(
     )
     uvicorn_error_file_handler.setLevel(logging.INFO)
     uvicorn_error_file_handler.setFormatter(detailed_formatter)
-    uvicorn_error_logger.addHandler(uvicorn_error_file_handler)
+    _attach_queue_handler(uvicorn_error_logger, uvicorn_error_file_handler)
     
     # ========== 配置根日志记录器（防止其他库的日志丢失）==========
     root_logger = logging.getLogger()
@@ -130,7 +178,7 @@ def setup_logging(
     )
     root_file_handler.setLevel(logging.WARNING)
     root_file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(root_file_handler)
+    _attach_queue_handler(root_logger, root_file_handler)
 
 
 def get_logger(name: str = "app") -> logging.Logger:
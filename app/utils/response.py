@@ -1,5 +1,6 @@
 """响应工具函数"""
 from typing import Any, Optional
+from fastapi.responses import ORJSONResponse
 from app.schemas.response import StandardResponse, SuccessResponse
 
 
@@ -17,6 +18,24 @@ def success_response(data: Any = None, message: str = "Success") -> StandardResp
     return SuccessResponse(code=0, message=message, data=data)
 
 
+def success_json_response(data: Any = None, message: str = "Success") -> ORJSONResponse:
+    """
+    创建成功响应，直接使用 orjson 序列化
+    
+    路由直接返回 Response 时，FastAPI 会跳过 response_model 的校验和序列化，
+    适合 data 已是可信数据（如已校验过的模型转换出的字典）的场景；
+    路由上的 response_model 仍会用于生成 OpenAPI 文档
+    
+    Args:
+        data: 响应数据，需为 orjson 可序列化的数据（dict、list、datetime 等）
+        message: 响应消息，默认为"Success"
+    
+    Returns:
+        ORJSONResponse: 响应对象，内容格式与 StandardResponse 一致，code=0
+    """
+    return ORJSONResponse({"code": 0, "message": message, "data": data})
+
+
 def error_response(code: int, message: str, data: Any = None) -> StandardResponse:
     """
     创建错误响应
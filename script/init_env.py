@@ -1,33 +1,33 @@
-import os
 import re
 import secrets
+from pathlib import Path
+
+# API_KEY 配置行（只匹配单行，值为空时不会把下一行一起替换掉）
+_API_KEY_RE = re.compile(r'^API_KEY[ \t]*=.*$', re.MULTILINE)
 
 
 def init_env():
-    if os.path.exists('.env'):
+    env_file = Path('.env')
+    env_local_file = Path('.env.local')
+    
+    if env_file.exists():
         print('已存在.env文件，无须初始化')
         return
     
-    if not os.path.exists('.env.local'):
+    if not env_local_file.exists():
         print('未找到.env.local文件，初始化失败')
         return
 
     # 读取.env.local文件内容
-    with open('.env.local', 'r', encoding='utf8') as f:
-        env_local_content = f.read()
+    env_local_content = env_local_file.read_text(encoding='utf8')
 
     # 创建一个.env文件，将ENV_NAME设置为prod
     env_local_content = env_local_content.replace('ENV_NAME = local', 'ENV_NAME = prod')
     # 生成32位随机API_KEY
-    env_local_content = re.sub(
-        r'API_KEY\s*=\s*.*',
-        f'API_KEY={secrets.token_hex(32)}',
-        env_local_content,
-        flags=re.MULTILINE,
-    )
+    api_key = secrets.token_hex(32)
+    env_local_content = _API_KEY_RE.sub(f'API_KEY={api_key}', env_local_content)
     # 写入.env文件
-    with open('.env', 'w', encoding='utf8') as f:
-        f.write(env_local_content)
+    env_file.write_text(env_local_content, encoding='utf8')
 
     # 初始化完成
     print('初始化完成，请修改.env文件')
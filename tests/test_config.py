@@ -0,0 +1,24 @@
+"""配置模块测试"""
+import unittest
+import orjson
+from app.config.config import Settings
+
+
+class SettingsTest(unittest.TestCase):
+    """Settings 测试"""
+    
+    def test_model_dump_json(self):
+        """默认配置可以序列化为 JSON"""
+        settings = Settings()
+        data = orjson.loads(settings.model_dump_json())
+        self.assertEqual(data["llm_models_config"]["qwen-plus"]["model_name"], "qwen-plus")
+    
+    def test_default_llm_models_config_not_shared(self):
+        """每个实例的默认模型配置互不影响"""
+        settings = Settings()
+        settings.llm_models_config["qwen-plus"]["temperature"] = 0
+        self.assertEqual(Settings().llm_models_config["qwen-plus"]["temperature"], 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
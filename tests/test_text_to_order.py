@@ -0,0 +1,81 @@
+"""文本转订单任务测试"""
+import unittest
+from app.services.task_manager import TaskManager
+from app.tasks.text_to_order.task import TextToOrderTask
+from app.utils.exceptions import CustomException
+
+
+class ValidateOutputFormatTest(unittest.TestCase):
+    """_validate_output_format 测试"""
+    
+    def setUp(self):
+        self.task = TextToOrderTask("test", {}, TaskManager())
+    
+    def assert_error(self, output, message):
+        with self.assertRaises(CustomException) as ctx:
+            self.task._validate_output_format(output)
+        self.assertEqual(ctx.exception.message, message)
+    
+    def test_normalize_products(self):
+        """去除名称首尾空白，补全可选字段"""
+        output = self.task._validate_output_format(
+            {"products": [{"name": " 猪肉 ", "quantity": 2, "unit": "斤"}]}
+        )
+        self.assertEqual(output, {"products": [
+            {"name": "猪肉", "quantity": 2, "unit": "斤", "price": None, "remark": None}
+        ]})
+    
+    def test_output_not_object(self):
+        """输出不是对象时，报告缺少 products 字段"""
+        self.assert_error([{"name": "a"}], "输出格式错误：缺少 'products' 字段")
+    
+    def test_products_not_list(self):
+        self.assert_error({"products": {}}, "输出格式错误：'products' 必须是数组")
+    
+    def test_product_not_object(self):
+        self.assert_error({"products": ["a"]}, "输出格式错误：products[0] 必须是对象")
+    
+    def test_missing_field_before_type_error(self):
+        """同一个商品中，缺少字段优先于类型错误"""
+        self.assert_error(
+            {"products": [{"name": 1, "unit": "斤"}]},
+            "商品格式错误：缺少必需字段 'quantity'"
+        )
+    
+    def test_earlier_product_error_before_later_missing_field(self):
+        """前面商品的类型错误优先于后面商品缺少的字段"""
+        self.assert_error(
+            {"products": [{"name": 1, "quantity": 1, "unit": "a"}, {"name": "b"}]},
+            "商品格式错误：name 必须是非空字符串"
+        )
+    
+    def test_earlier_product_missing_field_before_later_error(self):
+        """前面商品缺少的字段优先于后面商品的类型错误"""
+        self.assert_error(
+            {"products": [{"name": "a", "unit": "a"}, {"name": 1, "quantity": 1, "unit": "b"}]},
+            "商品格式错误：缺少必需字段 'quantity'"
+        )
+    
+    def test_quantity_errors(self):
+        self.assert_error(
+            {"products": [{"name": "a", "quantity": 0, "unit": "斤"}]},
+            "商品格式错误：quantity 必须大于0"
+        )
+        self.assert_error(
+            {"products": [{"name": "a", "quantity": True, "unit": "斤"}]},
+            "商品格式错误：quantity 必须是数字（整数或小数）"
+        )
+    
+    def test_optional_field_errors(self):
+        self.assert_error(
+            {"products": [{"name": "a", "quantity": 1, "unit": "斤", "price": "3"}]},
+            "商品格式错误：price 必须是数字或 null"
+        )
+        self.assert_error(
+            {"products": [{"name": "a", "quantity": 1, "unit": "斤", "remark": 1}]},
+            "商品格式错误：remark 必须是字符串或 null"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()